@@ -0,0 +1,109 @@
+from numba import njit
+import numpy as np
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _rsi(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Compiled kernel of the Relative Strength Index with Wilder's smoothing.
+
+    :param values: Close prices as a float64 array, contiguous or strided.
+    :param period: Number of periods to use for RSI calculation.
+    :return: RSI values where the first period entries are NaN due to insufficient data for initialization.
+    """
+    count: int = values.shape[0]
+    results: np.ndarray = np.full(count, np.nan)
+    if count <= period:
+        return results
+
+    # Compute gains and losses per period into preallocated arrays, the first period has no change. The differences
+    # are taken with indexed reads rather than np.diff, which Numba only supports on contiguous arrays
+    gains: np.ndarray = np.zeros(count)
+    losses: np.ndarray = np.zeros(count)
+    for index in range(1, count):
+        difference: float = values[index] - values[index - 1]
+        gains[index] = max(difference, 0.0)
+        losses[index] = max(-difference, 0.0)
+
+    # Initial average gain/loss
+    average_gain: float = gains[1:period + 1].sum()
+    average_loss: float = losses[1:period + 1].sum()
+    inverse_period: float = 1.0 / period
+    average_gain *= inverse_period
+    average_loss *= inverse_period
+
+    # Compute first RSI value, 100 - 100 / (1 + rs) is rewritten as 100 * gain / (gain + loss) to save divisions
+    results[period] = 100.0 if average_loss == 0.0 else 100.0 * average_gain / (average_gain + average_loss)
+
+    # Smoothing for subsequent values, with the Wilder weights hoisted out of the loop
+    decay: float = (period - 1) * inverse_period
+    for index in range(period + 1, count):
+        average_gain = average_gain * decay + gains[index] * inverse_period
+        average_loss = average_loss * decay + losses[index] * inverse_period
+        results[index] = 100.0 if average_loss == 0.0 else 100.0 * average_gain / (average_gain + average_loss)
+    return results
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _macd(values: np.ndarray, fast_period: int, slow_period: int, signal_period: int) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Compiled kernel of the Moving Average Convergence Divergence, maintaining the fast EMA, slow EMA, MACD line
+    and signal line recurrences together in a single pass over the close prices.
+
+    :param values: Close prices as a float64 array, contiguous or strided.
+    :param fast_period: Period for the fast EMA.
+    :param slow_period: Period for the slow EMA.
+    :param signal_period: Period for the signal line EMA.
+    :return: MACD line, signal line and histogram, where entries before initialization are NaN.
+    """
+    count: int = values.shape[0]
+    moving_average_line: np.ndarray = np.full(count, np.nan)
+    signal_line: np.ndarray = np.full(count, np.nan)
+    histogram: np.ndarray = np.full(count, np.nan)
+
+    # The MACD line starts once both EMAs are initialized
+    start: int = max(fast_period, slow_period) - 1
+    if count <= start:
+        return moving_average_line, signal_line, histogram
+
+    # Smoothing factors that determine weighting of recent values
+    fast_alpha: float = 2.0 / (fast_period + 1.0)
+    slow_alpha: float = 2.0 / (slow_period + 1.0)
+    signal_alpha: float = 2.0 / (signal_period + 1.0)
+    fast_decay: float = 1.0 - fast_alpha
+    slow_decay: float = 1.0 - slow_alpha
+    signal_decay: float = 1.0 - signal_alpha
+
+    # Initial EMAs by simple moving average of the first period prices, advanced up to the MACD start
+    moving_average_fast: float = values[:fast_period].mean()
+    for index in range(fast_period, start + 1):
+        moving_average_fast = fast_alpha * values[index] + fast_decay * moving_average_fast
+    moving_average_slow: float = values[:slow_period].mean()
+    for index in range(slow_period, start + 1):
+        moving_average_slow = slow_alpha * values[index] + slow_decay * moving_average_slow
+
+    signal_average: float = 0.0
+    for index in range(start, count):
+        if index > start:
+            moving_average_fast = fast_alpha * values[index] + fast_decay * moving_average_fast
+            moving_average_slow = slow_alpha * values[index] + slow_decay * moving_average_slow
+        moving_average: float = moving_average_fast - moving_average_slow
+        moving_average_line[index] = moving_average
+
+        # Initial signal by simple moving average of the first signal period MACD values, then the EMA formula
+        position: int = index - start + 1
+        if position < signal_period:
+            signal_average += moving_average
+            continue
+        if position == signal_period:
+            signal_average = (signal_average + moving_average) / signal_period
+        else:
+            signal_average = signal_alpha * moving_average + signal_decay * signal_average
+        signal_line[index] = signal_average
+        histogram[index] = moving_average - signal_average
+    return moving_average_line, signal_line, histogram
+
+# Compile the kernels at import so the first indicator call does not pay the JIT cost, the strided calls also
+# guard that strided close columns, such as stepped price batch slices, stay supported
+_rsi(np.zeros(2), 1)
+_rsi(np.zeros(4)[::2], 1)
+_macd(np.zeros(2), 1, 1, 1)
+_macd(np.zeros(4)[::2], 1, 1, 1)
@@ -1,38 +1,98 @@
-from core.price import PriceRepresentable
-from core.types import IndicatorRepresentable
-from typing import Sequence, Iterable
+from core.price import PriceRepresentable, PriceBatch
+from core.types import IndicatorRepresentable, IndicatorWindow
+from core._fastindicators import _rsi, _macd
+from typing import Sequence, Iterable, Optional, Union
+from scipy.signal import lfilter
+import numpy as np
+
+def _price_column(prices: Union[PriceBatch, Iterable[PriceRepresentable]], field: str) -> np.ndarray:
+    """Read one price field as a float64 array, directly from the column when a price batch is given."""
+    if isinstance(prices, PriceBatch):
+        return getattr(prices, field)
+    # Preallocate when the length is known, iterables without a length such as generators are read as they come
+    count: int = len(prices) if hasattr(prices, '__len__') else -1
+    return np.fromiter((getattr(price, field) for price in prices), dtype=np.float64, count=count)
+
+def _close_prices(prices: Union[PriceBatch, Iterable[PriceRepresentable], Sequence[float]]) -> np.ndarray:
+    """Read close prices as a float64 array, directly from the column when a price batch is given."""
+    if isinstance(prices, PriceBatch):
+        return prices.close_price
+
+    # Plain values, such as another indicator line, are used as they are once they hold no missing entries
+    if isinstance(prices, (np.ndarray, Sequence)) and (len(prices) == 0 or not hasattr(prices[0], 'close_price')):
+        if not isinstance(prices, np.ndarray) and None in prices:
+            raise ValueError("values contain None, remove the entries lacking data for initialization first")
+        return np.asarray(prices, dtype=np.float64)
+    return _price_column(prices, 'close_price')
+
+def _to_indicator(results: np.ndarray, warmup: int, tail: Optional[int] = None) -> IndicatorRepresentable:
+    """
+    Convert computed indicator values into Python floats, replacing the warmup entries with None.
 
-def exponential_moving_average(prices: Iterable[PriceRepresentable], period: int) -> IndicatorRepresentable:
+    :param results: Indicator values for the full series, as a float64 array.
+    :param warmup: Number of leading entries lacking data for initialization.
+    :param tail: If given, only the last tail entries are converted and returned as an indicator window.
+    :return: Indicator values where the first few entries are None due to insufficient data for initialization.
     """
-    The Exponential Moving Average (EMA) is an indicator that smooths out price data to reveal trends more clearly.
-    Unlike the Simple Moving Average (SMA), which gives equal weight to all data points, the EMA gives more weight
-    to recent prices, making it more responsive to new information.
+    offset: int = 0 if tail is None else max(len(results) - tail, 0)
+    values: IndicatorRepresentable = results[offset:].tolist()
 
-    :param prices: A collection of price records standardized into the system’s internal format.
+    # Only the warmup entries are NaN, so replace them with None without scanning the whole series
+    nones: int = min(max(warmup - offset, 0), len(values))
+    values[:nones] = [None] * nones
+    return values if tail is None else IndicatorWindow(offset=offset, values=values)
+
+def _ema_floats(values: np.ndarray, period: int, *, tail: Optional[int] = None) -> IndicatorRepresentable:
+    """
+    Compute the EMA over a plain float64 series, so values other than prices can be smoothed without wrapping
+    them into price records.
+
+    :param values: The series to smooth, as a float64 array.
     :param period: The number of periods over which to calculate the EMA.
+    :param tail: If given, only the last tail EMA values are kept.
     :return: EMA values where the first few entries are None due to insufficient data for initialization.
     """
+    results: np.ndarray = np.full(len(values), np.nan)
 
-    # Use close price to calculate EMA
-    values: Sequence[float] = [price.close_price for price in prices]
+    # Not enough data to initialize the EMA
+    if len(values) < period:
+        return _to_indicator(results, len(values), tail)
 
     # Initial EMA by simple moving average of the first period prices
-    previous_moving_average: float = sum(values[:period]) / period
+    previous_moving_average: float = values[:period].mean()
+    results[period - 1] = previous_moving_average
 
     # Smoothing factor that determines weighting of recent prices
     alpha: float = 2.0 / (period + 1.0)
 
-    # Initialize result list with Nones for the first values
-    results: IndicatorRepresentable = [None] * (period - 1)
-    results.append(previous_moving_average)
+    # Apply the EMA recurrence y[n] = alpha * x[n] + (1 - alpha) * y[n - 1] as a first-order IIR filter,
+    # seeding the filter state with the initial EMA so the scan runs in compiled code
+    results[period:] = lfilter(
+        [alpha], [1.0, -(1.0 - alpha)], values[period:], zi=np.array([(1.0 - alpha) * previous_moving_average])
+    )[0]
+    return _to_indicator(results, period - 1, tail)
 
-    # Iteratively apply the EMA formula for subsequent prices
-    for price in values[period:]:
-        previous_moving_average = alpha * price + (1.0 - alpha) * previous_moving_average
-        results.append(previous_moving_average)
-    return results
+def exponential_moving_average(
+        prices: Union[PriceBatch, Iterable[PriceRepresentable], Sequence[float]], period: int, *, tail: Optional[int] = None
+    ) -> IndicatorRepresentable:
+    """
+    The Exponential Moving Average (EMA) is an indicator that smooths out price data to reveal trends more clearly.
+    Unlike the Simple Moving Average (SMA), which gives equal weight to all data points, the EMA gives more weight
+    to recent prices, making it more responsive to new information.
+
+    :param prices: A collection of price records standardized into the system’s internal format, or plain values
+                   such as an indicator line with its None entries removed.
+    :param period: The number of periods over which to calculate the EMA.
+    :param tail: If given, only the last tail EMA values are kept, indexed by their positions in the full series.
+    :return: EMA values where the first few entries are None due to insufficient data for initialization.
+    """
+
+    # Use close price to calculate EMA
+    return _ema_floats(_close_prices(prices), period, tail=tail)
 
-def relative_strength_index(prices: Iterable[PriceRepresentable], period: int) -> IndicatorRepresentable:
+def relative_strength_index(
+        prices: Union[PriceBatch, Iterable[PriceRepresentable]], period: int, *, tail: Optional[int] = None
+    ) -> IndicatorRepresentable:
     """
     The Relative Strength Index (RSI) is a momentum oscillator to measure the speed and magnitude of recent
     price changes, helping traders identify overbought or oversold market conditions. Market is considered overbought
@@ -41,37 +101,15 @@ def relative_strength_index(prices: Iterable[PriceRepresentable], period: int) -
 
     :param prices: A collection of price records standardized into the system’s internal format.
     :param period: Number of periods to use for RSI calculation, the most common value is 14.
+    :param tail: If given, only the last tail RSI values are kept, indexed by their positions in the full series.
     :return: RSI values where the first few entries are None due to insufficient data for initialization.
     """
 
     # Use close price to calculate RSI
-    values: Sequence[float] = [price.close_price for price in prices]
-    gains: Sequence[float] = [0.0]
-    losses: Sequence[float] = [0.0]
-
-    # Compute gains and losses per period
-    for value in range(1, len(values)):
-        difference: float = values[value] - values[value - 1]
-        gains.append(max(difference, 0.0))
-        losses.append(max(-difference, 0.0))
-
-    # Initial average gain/loss
-    average_gain: float = sum(gains[1:period + 1]) / period
-    average_loss: float = sum(losses[1:period + 1]) / period
-
-    # Compute first RSI value
-    results: IndicatorRepresentable = [None] * period
-    results.append(100.0 if average_loss == 0.0 else 100.0 - (100.0 / (1.0 + average_gain / average_loss)))
-
-    # Smoothing for subsequent values
-    for value in range(period + 1, len(values)):
-        average_gain = (average_gain * (period - 1) + gains[value]) / period
-        average_loss = (average_loss * (period - 1) + losses[value]) / period
-        results.append(100.0 if average_loss == 0.0 else 100.0 - (100.0 / (1.0 + average_gain / average_loss)))
-    return results
+    return _to_indicator(_rsi(_close_prices(prices), period), period, tail)
 
 def moving_average_convergence_divergence(
-        prices: Iterable[PriceRepresentable], fast_period: int, slow_period: int, signal_period: int
+        prices: Union[PriceBatch, Iterable[PriceRepresentable]], fast_period: int, slow_period: int, signal_period: int
     ) -> (IndicatorRepresentable, IndicatorRepresentable, IndicatorRepresentable):
     """
     Moving Average Convergence Divergence (MACD) is a trend-following momentum indicator. It measures how two EMAs,
@@ -87,34 +125,19 @@ def moving_average_convergence_divergence(
              [2]: a histogram as the difference between MACD line and signal line.
     """
 
-    # Compute fast and slow exponential moving averages over the price series
-    moving_average_fast: IndicatorRepresentable = exponential_moving_average(prices, fast_period)
-    moving_average_slow: IndicatorRepresentable = exponential_moving_average(prices, slow_period)
-
-    # Compute the MACD line as the difference between the fast and slow EMAs
-    moving_average_line: IndicatorRepresentable = [
-        None if (value_fast is None or value_slow is None) else (value_fast - value_slow)
-        for value_fast, value_slow in zip(moving_average_fast, moving_average_slow)
-    ]
-
-    # Compute the EMA of the MACD line
-    signal_values: IndicatorRepresentable = exponential_moving_average([
-        PriceRepresentable(symbol=None, timestamp=None, open_price=None, high_price=None, low_price=None, close_price=value, volume=None)
-        for value in moving_average_line if value is not None
-    ], signal_period)
-
-    # Align the signal EMA result back to the full timeline
-    signal_line: IndicatorRepresentable = [None] * (len(moving_average_line) - len(signal_values)) + list(signal_values)
+    # Compute both EMAs, the MACD line and its signal line in a single fused pass over the close prices
+    moving_average_line, signal_line, histgram = _macd(_close_prices(prices), fast_period, slow_period, signal_period)
 
-    # Compute the MACD histogram as the difference between the MACD line and signal line
-    histgram: IndicatorRepresentable = [
-        None if (moving_average_value is None or signal_value is None) else (moving_average_value - signal_value)
-        for moving_average_value, signal_value in zip(moving_average_line, signal_line)
-    ]
+    # The MACD line starts once the slower EMA is initialized, the signal line and histogram after its own warmup
+    moving_average_warmup: int = max(fast_period, slow_period) - 1
+    signal_warmup: int = moving_average_warmup + signal_period - 1
+    return (
+        _to_indicator(moving_average_line, moving_average_warmup),
+        _to_indicator(signal_line, signal_warmup),
+        _to_indicator(histgram, signal_warmup)
+    )
 
-    return moving_average_line, signal_line, histgram
-
-def average_true_range(prices: Iterable[PriceRepresentable], period: int) -> IndicatorRepresentable:
+def average_true_range(prices: Union[PriceBatch, Iterable[PriceRepresentable]], period: int) -> IndicatorRepresentable:
     """
     Average True Range (ATR) is a pure volatility indicator, it does not care about whether price goes up or down,
     but how much does this market typically move per candle - not the direction, but the size of the movement.
@@ -123,26 +146,29 @@ def average_true_range(prices: Iterable[PriceRepresentable], period: int) -> Ind
     :param period: The number of periods over which to calculate the volatility.
     :return: ATR values where the first few entries are None due to insufficient data for initialization.
     """
-    true_range: Sequence[float] = []
-    previous_close_price: Optional[float] = None
-
-    # Compute True Range for each price
-    for price in range(len(prices)):
-        high_price: float = prices[price].high_price
-        low_price: float = prices[price].low_price
-        true_range.append(high_price - low_price if previous_close_price is None else max(
-            high_price - low_price, abs(high_price - previous_close_price), abs(low_price - previous_close_price)
-        ))
-
-        previous_close_price = prices[price].close_price
+    # Price records given as a one-shot iterable are gathered once, since three columns are read from them
+    if not isinstance(prices, (PriceBatch, Sequence)):
+        prices = list(prices)
+    high_prices: np.ndarray = _price_column(prices, 'high_price')
+    low_prices: np.ndarray = _price_column(prices, 'low_price')
+    previous_close_prices: np.ndarray = _price_column(prices, 'close_price')[:-1]
+
+    # Compute True Range for each price, the first price has no previous close to compare against
+    true_range: np.ndarray = high_prices - low_prices
+    true_range[1:] = np.maximum.reduce((
+        true_range[1:], np.abs(high_prices[1:] - previous_close_prices), np.abs(low_prices[1:] - previous_close_prices)
+    ))
+    true_ranges: Sequence[float] = true_range.tolist()
 
     # Compute first ATR value
     results: IndicatorRepresentable = [None] * (period - 1)
-    previous_true_range: float = sum(true_range[0:period]) / period
+    previous_true_range: float = sum(true_ranges[0:period]) / period
     results.append(previous_true_range)
 
-    # Smoothing for subsequent values
-    for value in range(period, len(prices)):
-        previous_true_range = (previous_true_range * (period - 1) + true_range[value]) / period
+    # Smoothing for subsequent values, with the Wilder weights hoisted out of the loop
+    inverse_period: float = 1.0 / period
+    decay: float = (period - 1) * inverse_period
+    for value in range(period, len(true_ranges)):
+        previous_true_range = previous_true_range * decay + true_ranges[value] * inverse_period
         results.append(previous_true_range)
     return results
@@ -1,38 +1,96 @@
 from core.types import immutable, IndicatorRepresentable
-from core.price import PriceRepresentable
+from core.price import PriceBatch
+from core.utilities import milliseconds_to_clock
 from core.execution import TradeExecution
-from typing import Iterable, Dict, Protocol, runtime_checkable
+from typing import Any, Iterable, Dict, List, Protocol, runtime_checkable
 from enum import Enum
 from zoneinfo import ZoneInfo
+import numpy as np
+
+# Time zone used to present price timestamps to the language model.
+_NY_TZ: ZoneInfo = ZoneInfo('America/New_York')
 
 class PreferredLanguage(Enum):
     ENGLISH = "English"
     CHINESE = "Chinese"
 
 class LocalizableString:
-    contents: Dict[PreferredLanguage, str]
+    # Each language keeps its appended chunks and joins them only when read, so appends stay linear
+    contents: Dict[PreferredLanguage, List[str]]
 
     def __init__(self, strings: Dict[PreferredLanguage, str]):
-        self.contents = strings
+        self.contents = {language: [string] for language, string in strings.items()}
+
+    @classmethod
+    def formatted(cls, template: Dict[PreferredLanguage, str], **kwargs: Any) -> 'LocalizableString':
+        return cls({language: string.format(**kwargs) for language, string in template.items()})
 
     def get(self, preference: PreferredLanguage):
-        return self.contents[preference]
+        return ''.join(self.contents[preference])
 
     def append(self, other: 'LocalizableString') -> None:
         for language in self.contents.keys():
-            self.contents[language] = self.contents[language] + other.contents[language]
+            self.contents[language].extend(other.contents[language])
 
     def append_break(self, prefix: str = '\n', suffix: str = '\n'):
         for language in self.contents.keys():
-            self.contents[language] = self.contents[language] + f"{prefix}<break>{suffix}"
+            self.contents[language].append(f"{prefix}<break>{suffix}")
 
     def append_begin(self, prefix: str = '\n', suffix: str = '\n'):
         for language in self.contents.keys():
-            self.contents[language] = self.contents[language] + f"{prefix}<begin>{suffix}"
+            self.contents[language].append(f"{prefix}<begin>{suffix}")
 
     def append_end(self, prefix: str = '\n', suffix: str = '\n'):
         for language in self.contents.keys():
-            self.contents[language] = self.contents[language] + f"{prefix}<end>{suffix}"
+            self.contents[language].append(f"{prefix}<end>{suffix}")
+
+# Static prompt fragments, formatted with LocalizableString.formatted where they have placeholders.
+_SYMBOL_TEMPLATE: Dict[PreferredLanguage, str] = {
+    PreferredLanguage.ENGLISH: "Symbol: {symbol}", PreferredLanguage.CHINESE: "交易代码：{symbol}"
+}
+_PRICE_INDICATOR_HEADER_TEMPLATE: Dict[PreferredLanguage, str] = {
+    PreferredLanguage.ENGLISH: "Prices & Indicators({interval}): Timestamp, Open, High, Low, Close, Volume, EMA20, EMA50, RSI;",
+    PreferredLanguage.CHINESE: "价格指标表（{interval}）：时间戳，开盘，最高，最低，收盘，成交量，EMA20，EMA50，RSI；"
+}
+_TRADE_REVIEWER_TEMPLATE: Dict[PreferredLanguage, str] = {
+    PreferredLanguage.ENGLISH: "You are now a trade reviewer, and you need to conduct a post-trade analysis "
+                               "of this transaction based on the following information: ",
+    PreferredLanguage.CHINESE: "你现在是一位交易复盘师，你需要根据下列信息复盘本次交易："
+}
+_OPEN_POSITION_TEMPLATE: Dict[PreferredLanguage, str] = {
+    PreferredLanguage.ENGLISH: "At ${execution.buy_price} at {execution.consumable_buy_timestamp} I opened a position ",
+    PreferredLanguage.CHINESE: "我在{execution.consumable_buy_timestamp}以${execution.buy_price}开仓"
+}
+_SHORT_POSITION_TEMPLATE: Dict[PreferredLanguage, str] = {
+    PreferredLanguage.ENGLISH: "on short, ", PreferredLanguage.CHINESE: "看空，"
+}
+_LONG_POSITION_TEMPLATE: Dict[PreferredLanguage, str] = {
+    PreferredLanguage.ENGLISH: "on long, ", PreferredLanguage.CHINESE: "看多，"
+}
+_CLOSE_POSITION_TEMPLATE: Dict[PreferredLanguage, str] = {
+    PreferredLanguage.ENGLISH: "at ${execution.consumable_sell_timestamp} at {execution.sell_price} I closed the position, "
+                               "realizing a profit of {execution.profit}."
+                               "My position settings were a "
+                               "take-profit at ${execution.take_profit} ({execution.take_profit_rate}% of "
+                               "total equity) and a stop-loss at ${execution.stop_loss} "
+                               "({execution.prior_cost_rate}% of total equity). My estimated win rate "
+                               "was {execution.win_rate}%, with an expected risk-reward ratio of "
+                               "{execution.reward_risk_ratio}:1 based on this. This trade resulted in a "
+                               "{execution.posterior_growth_rate}% growth in the account. ",
+    PreferredLanguage.CHINESE: "{execution.consumable_sell_timestamp}以${execution.sell_price}平仓"
+                               "盈利${execution.profit}。"
+                               "我的仓位设置是，${execution.take_profit}止盈（{execution.take_profit_rate}%总资产），"
+                               "${execution.stop_loss}止损（{execution.prior_cost_rate}%总资产）。我的预估胜率是{execution.win_rate}%，"
+                               "基于此的期望盈亏比是{execution.reward_risk_ratio}:1。本单实现{execution.posterior_growth_rate}%的账户增长。"
+}
+_PRICE_INDICATOR_INTRODUCTION_TEMPLATE: Dict[PreferredLanguage, str] = {
+    PreferredLanguage.ENGLISH: "Below are the price and indicator data for that period: ",
+    PreferredLanguage.CHINESE: "下面是那段时间的价格和指标数据："
+}
+_TRADE_REVIEW_REQUEST_TEMPLATE: Dict[PreferredLanguage, str] = {
+    PreferredLanguage.ENGLISH: "Based on the information above, provide a post-trade analysis.",
+    PreferredLanguage.CHINESE: "基于上述信息进行交易复盘。"
+}
 
 @runtime_checkable
 class LLMConsumable(Protocol):
@@ -46,44 +104,39 @@ class LLMContext(Protocol):
 
 @immutable
 class PriceIndicatorSnapshot(LLMConsumable):
-    prices: Iterable[PriceRepresentable]
+    prices: PriceBatch
     rsi: IndicatorRepresentable
     ema20: IndicatorRepresentable
     ema50: IndicatorRepresentable
     window_size: int
 
     def to_consumable(self) -> LocalizableString:
-        result: LocalizableString = LocalizableString({
-            PreferredLanguage.ENGLISH: "Symbol: ", PreferredLanguage.CHINESE: "交易代码："
-        })
-        symbol: str = self.prices[0].symbol.instrument.value
-        result.append(LocalizableString({PreferredLanguage.ENGLISH: symbol, PreferredLanguage.CHINESE: symbol}))
+        result: LocalizableString = LocalizableString.formatted(_SYMBOL_TEMPLATE, symbol=self.prices.symbol.instrument.value)
         result.append_break()
-
-        price_interval: str = self.prices[0].interval.value
-        result.append(LocalizableString({
-            PreferredLanguage.ENGLISH: f"Prices & Indicators({price_interval}): ", PreferredLanguage.CHINESE: f"价格指标表（{price_interval}）："
-        }))
-
-        result.append(LocalizableString({
-            PreferredLanguage.ENGLISH: "Timestamp, Open, High, Low, Close, Volume, EMA20, EMA50, RSI;",
-            PreferredLanguage.CHINESE: "时间戳，开盘，最高，最低，收盘，成交量，EMA20，EMA50，RSI；"
-        }))
+        result.append(LocalizableString.formatted(_PRICE_INDICATOR_HEADER_TEMPLATE, interval=self.prices.interval.value))
         result.append_begin()
 
-        for index in range(len(self.prices) - self.window_size, len(self.prices)):
-            price: PriceRepresentable = self.prices[index]
-            rsi_value: str = str(int(self.rsi[index])) if self.rsi[index] is not None else 'nan'
-            ema20_value: str = str(int(self.ema20[index])) if self.ema20[index] is not None else 'nan'
-            ema50_value: str = str(int(self.ema50[index])) if self.ema50[index] is not None else 'nan'
-
-            values: str = (f"{price.timestamp.astimezone(ZoneInfo('America/New_York')).strftime('%H:%M')}, "
-                           f"{int(price.open_price)}, {int(price.high_price)}, {int(price.low_price)},"
-                           f" {int(price.close_price)}, {int(price.volume)}, {ema20_value}, {ema50_value}, {rsi_value};\n")
-
-            result.append(LocalizableString({
-                PreferredLanguage.ENGLISH: values, PreferredLanguage.CHINESE: values
-            }))
+        # Read the trailing window straight from the price columns instead of materializing price records
+        window: slice = slice(len(self.prices) - self.window_size, len(self.prices))
+        rows: List[str] = []
+        for timestamp, open_price, high_price, low_price, close_price, volume, rsi, ema20, ema50 in zip(
+                milliseconds_to_clock(self.prices.timestamp[window].astype(np.int64), _NY_TZ),
+                self.prices.open_price[window].tolist(),
+                self.prices.high_price[window].tolist(), self.prices.low_price[window].tolist(),
+                self.prices.close_price[window].tolist(), self.prices.volume[window].tolist(),
+                self.rsi[window], self.ema20[window], self.ema50[window]
+            ):
+            rsi_value: str = str(int(rsi)) if rsi is not None else 'nan'
+            ema20_value: str = str(int(ema20)) if ema20 is not None else 'nan'
+            ema50_value: str = str(int(ema50)) if ema50 is not None else 'nan'
+
+            rows.append(f"{timestamp}, "
+                        f"{int(open_price)}, {int(high_price)}, {int(low_price)},"
+                        f" {int(close_price)}, {int(volume)}, {ema20_value}, {ema50_value}, {rsi_value};\n")
+
+        # The rows are identical across languages, so join them once and append the whole window
+        values: str = ''.join(rows)
+        result.append(LocalizableString({PreferredLanguage.ENGLISH: values, PreferredLanguage.CHINESE: values}))
 
         result.append_end(prefix='', suffix='')
         return result
@@ -95,48 +148,19 @@ class TradeReviewContext(LLMContext):
     comments: LocalizableString
 
     def build_context(self) -> LocalizableString:
-        result: LocalizableString = LocalizableString({
-            PreferredLanguage.ENGLISH: "You are now a trade reviewer, and you need to conduct a post-trade analysis "
-                                       "of this transaction based on the following information: ",
-            PreferredLanguage.CHINESE: "你现在是一位交易复盘师，你需要根据下列信息复盘本次交易："
-        })
+        result: LocalizableString = LocalizableString(_TRADE_REVIEWER_TEMPLATE)
 
         for execution in self.executions:
             result.append_begin()
-
-            result.append(LocalizableString({
-                PreferredLanguage.ENGLISH: f"At ${execution.buy_price} at {execution.consumable_buy_timestamp} I opened a position ",
-                PreferredLanguage.CHINESE: f"我在{execution.consumable_buy_timestamp}以${execution.buy_price}开仓"
-            }))
-            result.append(LocalizableString({
-                PreferredLanguage.ENGLISH: "on short, " if execution.is_sell_before_buy else "on long, ",
-                PreferredLanguage.CHINESE: "看空，" if execution.is_sell_before_buy else "看多，"
-            }))
-            result.append(LocalizableString({
-                PreferredLanguage.ENGLISH: f"at ${execution.consumable_sell_timestamp} at {execution.sell_price} I closed the position, ",
-                PreferredLanguage.CHINESE: f"{execution.consumable_sell_timestamp}以${execution.sell_price}平仓"
-            }))
-            result.append(LocalizableString({
-                PreferredLanguage.ENGLISH: f"realizing a profit of {execution.profit}."
-                                           f"My position settings were a "
-                                           f"take-profit at ${execution.take_profit} ({execution.take_profit_rate}% of "
-                                           f"total equity) and a stop-loss at ${execution.stop_loss} "
-                                           f"({execution.prior_cost_rate}% of total equity). My estimated win rate "
-                                           f"was {execution.win_rate}%, with an expected risk-reward ratio of "
-                                           f"{execution.reward_risk_ratio}:1 based on this. This trade resulted in a "
-                                           f"{execution.posterior_growth_rate}% growth in the account. ",
-                PreferredLanguage.CHINESE: f"盈利${execution.profit}。"
-                                           f"我的仓位设置是，${execution.take_profit}止盈（{execution.take_profit_rate}%总资产），"
-                                           f"${execution.stop_loss}止损（{execution.prior_cost_rate}%总资产）。我的预估胜率是{execution.win_rate}%，"
-                                           f"基于此的期望盈亏比是{execution.reward_risk_ratio}:1。本单实现{execution.posterior_growth_rate}%的账户增长。"
-            }))
+            result.append(LocalizableString.formatted(_OPEN_POSITION_TEMPLATE, execution=execution))
+            result.append(LocalizableString(
+                _SHORT_POSITION_TEMPLATE if execution.is_sell_before_buy else _LONG_POSITION_TEMPLATE
+            ))
+            result.append(LocalizableString.formatted(_CLOSE_POSITION_TEMPLATE, execution=execution))
             result.append_end(suffix='')
 
         result.append_break()
-        result.append(LocalizableString({
-            PreferredLanguage.ENGLISH: "Below are the price and indicator data for that period: ",
-            PreferredLanguage.CHINESE: "下面是那段时间的价格和指标数据："
-        }))
+        result.append(LocalizableString(_PRICE_INDICATOR_INTRODUCTION_TEMPLATE))
 
         result.append_break()
         result.append(self.price_snapshot.to_consumable())
@@ -145,9 +169,6 @@ class TradeReviewContext(LLMContext):
         result.append(self.comments)
 
         result.append_break()
-        result.append(LocalizableString({
-            PreferredLanguage.ENGLISH: "Based on the information above, provide a post-trade analysis.",
-            PreferredLanguage.CHINESE: "基于上述信息进行交易复盘。"
-        }))
+        result.append(LocalizableString(_TRADE_REVIEW_REQUEST_TEMPLATE))
 
         return result
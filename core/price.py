@@ -1,9 +1,22 @@
 from core.types import immutable
-from core.utilities import datatime_to_milliseconds, milliseconds_to_datatime
+from core.utilities import datatime_to_milliseconds, milliseconds_to_datatime, datatime_now
 from enum import Enum
-from typing import Protocol, Iterable, List, Dict, Any, Optional, runtime_checkable
+from typing import Protocol, Iterable, Iterator, List, Dict, Any, Optional, Sequence, Tuple, Union, runtime_checkable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
 from datetime import datetime
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import numpy as np
 import requests
+import sqlite3
+
+# Prefer orjson for parsing large Binance responses, the standard library parser is a drop-in fallback.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 class PriceInterval(Enum):
     """
@@ -55,7 +68,7 @@ class MarketIdentifier:
     # The classification of the instrument, specifying its market type.
     category: TradableCategory
 
-@immutable
+@immutable(frozen=False)
 class PriceRepresentable:
     """
     A type that defines price movement within a specific time interval, representing a complete snapshot of market
@@ -87,6 +100,75 @@ class PriceRepresentable:
     # The discrete unit or range within which price movements are measured.
     interval: PriceInterval
 
+# Array fields have no single truth value, so equality and field hashing are left to object identity
+@dataclass(frozen=True, eq=False)
+class PriceBatch:
+    """
+    A type that defines a columnar collection of price records for a single trading symbol and interval, where each
+    field is stored as one contiguous array so that indicators read a flat buffer instead of walking every record.
+    It can still be indexed and iterated as a sequence of PriceRepresentable for record-oriented consumers.
+    """
+
+    # The trading symbol or pair identifier shared by every price record in the batch.
+    symbol: MarketIdentifier
+
+    # The discrete unit or range within which price movements are measured.
+    interval: PriceInterval
+
+    # The open time of each price record as datetime64[ms], expressed in UTC.
+    timestamp: np.ndarray
+
+    # The price of the first executed trade during each interval, as float64.
+    open_price: np.ndarray
+
+    # The highest traded price observed during each interval, as float64.
+    high_price: np.ndarray
+
+    # The lowest traded price observed during each interval, as float64.
+    low_price: np.ndarray
+
+    # The last traded price at the end of each interval, as float64.
+    close_price: np.ndarray
+
+    # The total traded quantity of the asset during each interval, as float64.
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close_price)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[PriceRepresentable, 'PriceBatch']:
+        if isinstance(index, slice):
+            columns: Dict[str, np.ndarray] = {
+                field: getattr(self, field)[index]
+                for field in ('timestamp', 'open_price', 'high_price', 'low_price', 'close_price', 'volume')
+            }
+
+            # Contiguous ranges share the columns, stepped slices are copied so every column stays contiguous
+            if index.step not in (None, 1):
+                columns = {field: np.ascontiguousarray(values) for field, values in columns.items()}
+            return replace(self, **columns)
+        return PriceRepresentable(
+            symbol=self.symbol, timestamp=milliseconds_to_datatime(int(self.timestamp[index].astype(np.int64))),
+            open_price=float(self.open_price[index]), high_price=float(self.high_price[index]),
+            low_price=float(self.low_price[index]), close_price=float(self.close_price[index]),
+            volume=float(self.volume[index]), interval=self.interval
+        )
+
+    def __iter__(self) -> Iterator[PriceRepresentable]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def concatenate(self, other: 'PriceBatch') -> 'PriceBatch':
+        """Returns a new batch holding the price records of this batch followed by those of the other batch."""
+        return replace(
+            self, timestamp=np.concatenate((self.timestamp, other.timestamp)),
+            open_price=np.concatenate((self.open_price, other.open_price)),
+            high_price=np.concatenate((self.high_price, other.high_price)),
+            low_price=np.concatenate((self.low_price, other.low_price)),
+            close_price=np.concatenate((self.close_price, other.close_price)),
+            volume=np.concatenate((self.volume, other.volume))
+        )
+
 @immutable
 class PriceProviderContext:
     """
@@ -126,6 +208,21 @@ class PriceProvider(Protocol):
         """
         ...
 
+# Binance uses different string representations for intervals.
+_BINANCE_INTERVAL: Dict[PriceInterval, str] = {
+    PriceInterval.minute: '1m', PriceInterval.minute5: '5m', PriceInterval.minute15: '15m',
+    PriceInterval.minute30: '30m', PriceInterval.hour: '1h', PriceInterval.hour4: '4h',
+    PriceInterval.day: '1d', PriceInterval.week: '1w', PriceInterval.month: '1M'
+}
+
+# Length of each interval in milliseconds for intervals whose bars are aligned to the Unix epoch.
+# Weekly and monthly bars are not aligned this way, so they are not listed.
+_INTERVAL_MILLISECONDS: Dict[PriceInterval, int] = {
+    PriceInterval.minute: 60_000, PriceInterval.minute5: 300_000, PriceInterval.minute15: 900_000,
+    PriceInterval.minute30: 1_800_000, PriceInterval.hour: 3_600_000, PriceInterval.hour4: 14_400_000,
+    PriceInterval.day: 86_400_000
+}
+
 class BinancePriceProvider(PriceProvider):
     """
     A concrete implementation of PriceProvider that retrieves historical price data from Binance's public REST API.
@@ -139,28 +236,34 @@ class BinancePriceProvider(PriceProvider):
     # Timeout in seconds for HTTP requests to prevent indefinite blocking.
     timeout: int = 5
 
-    def fetch(self, context: PriceProviderContext) -> Iterable[PriceRepresentable]:
+    # Number of times a failed or throttled HTTP request is retried with exponential backoff.
+    retries: int = 3
+
+    def __init__(self):
+        # Reuse one session so paginated requests share keep-alive connections instead of a new TLS handshake each
+        self._session: requests.Session = requests.Session()
+        self._session.headers.update({'Accept-Encoding': 'gzip'})
+        self._session.mount('https://', HTTPAdapter(max_retries=Retry(
+            total=self.retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET',)
+        )))
+
+    def fetch(self, context: PriceProviderContext) -> PriceBatch:
         """
-        Fetches historical or real-time price data according to the given context, returns an iterable object,
-        each representing a single time interval with open, high, low, close, and volume data.
+        Fetches historical or real-time price data according to the given context, returns a columnar price batch,
+        each row representing a single time interval with open, high, low, close, and volume data.
 
         :param context: The context specifying which instrument, interval, and time range to retrieve.
         :return: A collection of price records standardized into the system’s internal format.
         """
 
         # Binance uses different string representations for intervals, so convert to Binance format
-        binance_price_interval: Dict[PriceInterval, str] = {
-            PriceInterval.minute: '1m', PriceInterval.minute5: '5m', PriceInterval.minute15: '15m',
-            PriceInterval.minute30: '30m', PriceInterval.hour: '1h', PriceInterval.hour4: '4h',
-            PriceInterval.day: '1d', PriceInterval.week: '1w', PriceInterval.month: '1M'
-        }
-        interval: str = binance_price_interval[context.interval]
+        interval: str = _BINANCE_INTERVAL[context.interval]
 
         # Convert datetime to milliseconds for Binance API
         start_time: int = datatime_to_milliseconds(context.start_time)
         end_time: int = datatime_to_milliseconds(context.end_time)
 
-        prices: Iterable[PriceRepresentable] = []
+        klines: List[List[Any]] = []
         next_start_time: int = start_time
 
         # Continue fetching while the next start time is before the requested end time
@@ -171,28 +274,158 @@ class BinancePriceProvider(PriceProvider):
             }
 
             # Send the HTTP GET request to Binance API and parse JSON response into Python list of arrays
-            response: Response = requests.get(self.binance_url, params=parameters, timeout=self.timeout)
-            contents: List[Any] = response.json()
+            response: requests.Response = self._session.get(self.binance_url, params=parameters, timeout=self.timeout)
+            contents: List[Any] = _json_loads(response.content)
 
             # Break if no data is returned, as we reached the end of available history
             if not contents:
                 break
 
-            # Iterate through each entry returned by Binance
-            for content in contents:
-                # Binance price data schema: [0] openTime(ms), [1] open, [2] high, [3] low, [4] close, [5] volume,
-                # [6] closeTime(ms), [7] quoteAssetVolume, [8] numberOfTrades, [9] takerBuyBaseAssetVolume, ...
-                open_time: datetime = milliseconds_to_datatime(int(content[0]))
-                prices.append(PriceRepresentable(
-                    symbol=context.symbol, timestamp=open_time, open_price=float(content[1]), high_price=float(content[2]),
-                    low_price=float(content[3]), close_price=float(content[4]), volume=float(content[5]), interval=context.interval
-                ))
+            # Keep the raw entries returned by Binance, they are converted into columns once all pages are fetched
+            klines.extend(contents)
 
-                # Stop early if we exceed the requested limit
-                if context.limit is not None and len(prices) > context.limit:
-                    return prices
+            # Stop early once we reach the requested limit
+            if context.limit is not None and len(klines) >= context.limit:
+                return self._to_price_batch(context, klines[:context.limit])
 
             # Advance to the next starting timestamp after the last price in this batch.
             next_start_time = int(contents[-1][6]) + 1
-        return sorted(prices, key=lambda price: price.timestamp)
 
+        # Binance returns entries in ascending open time and pages never overlap, so no sorting is needed
+        return self._to_price_batch(context, klines)
+
+    def fetch_many(
+            self, contexts: Sequence[PriceProviderContext], max_workers: int = 8
+        ) -> Dict[PriceProviderContext, PriceBatch]:
+        """
+        Fetches price data for several contexts concurrently. Fetching is bound by network round trips, which release
+        the GIL, so worker threads overlap their requests while sharing the connection pool of this provider.
+
+        :param contexts: The contexts specifying which instruments, intervals, and time ranges to retrieve.
+        :param max_workers: The maximum number of contexts fetched at the same time.
+        :return: A collection of price records for each requested context, so the same instrument can be fetched
+                 at several intervals or time ranges at once.
+        """
+        prices: Dict[PriceProviderContext, PriceBatch] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.fetch, context): context for context in contexts}
+            for future in as_completed(futures):
+                prices[futures[future]] = future.result()
+        return prices
+
+    @staticmethod
+    def _to_price_batch(context: PriceProviderContext, klines: List[List[Any]]) -> PriceBatch:
+        """
+        Converts raw Binance entries into a price batch with a single bulk cast per field.
+
+        :param context: The context the entries were fetched with.
+        :param klines: Entries returned by Binance, ordered by open time.
+        :return: A collection of price records standardized into the system’s internal format.
+        """
+
+        # Binance price data schema: [0] openTime(ms), [1] open, [2] high, [3] low, [4] close, [5] volume,
+        # [6] closeTime(ms), [7] quoteAssetVolume, [8] numberOfTrades, [9] takerBuyBaseAssetVolume, ...
+        # Lay the entries out as a 2D array once, so each field is parsed by a single vectorized cast of its column
+        entries: np.ndarray = np.asarray(klines, dtype=object) if klines else np.empty((0, 6), dtype=object)
+        return PriceBatch(
+            symbol=context.symbol, interval=context.interval,
+            timestamp=entries[:, 0].astype(np.int64).astype('datetime64[ms]'),
+            open_price=entries[:, 1].astype(np.float64), high_price=entries[:, 2].astype(np.float64),
+            low_price=entries[:, 3].astype(np.float64), close_price=entries[:, 4].astype(np.float64),
+            volume=entries[:, 5].astype(np.float64)
+        )
+
+class CachedPriceProvider(PriceProvider):
+    """
+    A PriceProvider that keeps fully closed price records in a local SQLite database and only asks the wrapped provider
+    for the records that are not cached yet. A closed record never changes, so it can be served locally on every
+    later fetch of an overlapping time range. The wrapped provider must return a PriceBatch, like BinancePriceProvider.
+    Intervals whose bars are not aligned to the Unix epoch, such as weeks and months, are passed through uncached.
+    """
+
+    # Default location of the SQLite database, relative to the working directory.
+    path: str = '.cache/prices.sqlite3'
+
+    def __init__(self, provider: PriceProvider, path: Optional[str] = None):
+        self.provider = provider
+        self.path = path or self.path
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection: sqlite3.Connection = sqlite3.connect(self.path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            "symbol TEXT NOT NULL, interval TEXT NOT NULL, open_time INTEGER NOT NULL, "
+            "open_price REAL NOT NULL, high_price REAL NOT NULL, low_price REAL NOT NULL, "
+            "close_price REAL NOT NULL, volume REAL NOT NULL, "
+            "PRIMARY KEY (symbol, interval, open_time)) WITHOUT ROWID"
+        )
+
+    def fetch(self, context: PriceProviderContext) -> PriceBatch:
+        """
+        Fetches historical or real-time price data according to the given context, serving the leading closed records
+        from the cache and fetching only the remaining tail from the wrapped provider.
+
+        :param context: The context specifying which instrument, interval, and time range to retrieve.
+        :return: A collection of price records standardized into the system’s internal format.
+        """
+        interval: Optional[int] = _INTERVAL_MILLISECONDS.get(context.interval)
+        if interval is None:
+            return self.provider.fetch(context)
+
+        # The first record opens at the first interval boundary at or after the start time
+        start_time: int = -(-datatime_to_milliseconds(context.start_time) // interval) * interval
+        end_time: int = datatime_to_milliseconds(context.end_time)
+        cached: PriceBatch = self._load(context, start_time, end_time)
+        if context.limit is not None and len(cached) >= context.limit:
+            return cached[:context.limit]
+
+        # Fetch whatever follows the cached records, which is at least the bars that are still open
+        next_start_time: int = start_time + len(cached) * interval
+        if next_start_time >= end_time:
+            return cached
+        fetched: PriceBatch = self.provider.fetch(replace(
+            context, start_time=milliseconds_to_datatime(next_start_time),
+            limit=None if context.limit is None else context.limit - len(cached)
+        ))
+
+        # Only records closed for a whole interval are stored, so a bar still being updated is never cached
+        closed: int = int(np.searchsorted(
+            fetched.timestamp.astype(np.int64), datatime_to_milliseconds(datatime_now()) - 2 * interval, side='right'
+        ))
+        self._store(fetched[:closed])
+        return cached.concatenate(fetched)
+
+    def _load(self, context: PriceProviderContext, start_time: int, end_time: int) -> PriceBatch:
+        """Loads the cached records that follow one another without gaps from the start time."""
+        rows: List[Tuple[int, float, float, float, float, float]] = self._connection.execute(
+            "SELECT open_time, open_price, high_price, low_price, close_price, volume FROM prices "
+            "WHERE symbol = ? AND interval = ? AND open_time >= ? AND open_time < ? ORDER BY open_time",
+            (context.symbol.instrument.value, context.interval.value, start_time, end_time)
+        ).fetchall()
+        open_times: np.ndarray = np.asarray([row[0] for row in rows], dtype=np.int64)
+        values: np.ndarray = np.asarray([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), 5)
+
+        # Cut the records at the first missing bar, everything after it is fetched again
+        expected: np.ndarray = start_time + np.arange(len(rows), dtype=np.int64) * _INTERVAL_MILLISECONDS[context.interval]
+        gaps: np.ndarray = np.flatnonzero(open_times != expected)
+        count: int = int(gaps[0]) if len(gaps) else len(rows)
+
+        # Transpose the rows into one contiguous block so each column shares the layout of freshly fetched batches
+        columns: np.ndarray = np.ascontiguousarray(values[:count].T)
+        return PriceBatch(
+            symbol=context.symbol, interval=context.interval,
+            timestamp=open_times[:count].astype('datetime64[ms]'), open_price=columns[0],
+            high_price=columns[1], low_price=columns[2], close_price=columns[3], volume=columns[4]
+        )
+
+    def _store(self, prices: PriceBatch) -> None:
+        """Stores closed records, replacing any previously cached copies."""
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(
+                    [prices.symbol.instrument.value] * len(prices), [prices.interval.value] * len(prices),
+                    prices.timestamp.astype(np.int64).tolist(), prices.open_price.tolist(),
+                    prices.high_price.tolist(), prices.low_price.tolist(), prices.close_price.tolist(),
+                    prices.volume.tolist()
+                )
+            )
@@ -1,12 +1,46 @@
 from dataclasses import dataclass
-from typing import Any, Iterable, Optional
+from itertools import chain, repeat
+from typing import Any, Iterable, Iterator, List, Optional, Union
 
-def immutable(wrapped_class: Any) -> Any:
+def immutable(wrapped_class: Any = None, *, frozen: bool = True) -> Any:
     """
-    A decorator that makes a class immutable and hashable by automatically generating boilerplate methods.
+    A decorator that by default makes a class immutable and hashable by automatically generating boilerplate methods.
     It provides data integrity, hashable records and thread-safety in concurrent contexts for a class.
+    Value types constructed in bulk that are never mutated or hashed can opt out with frozen=False, which generates
+    a mutable slotted class without frozen attribute checks for faster construction and a smaller memory footprint.
     """
-    return dataclass(frozen=True)(wrapped_class)
+    def wrap(wrapped_class: Any) -> Any:
+        return dataclass(frozen=True)(wrapped_class) if frozen else dataclass(slots=True)(wrapped_class)
+    return wrap if wrapped_class is None else wrap(wrapped_class)
 
 # A type that defines sequences of numeric values corresponding to each input price point.
 IndicatorRepresentable = Iterable[Optional[float]]
+
+# The values list makes field hashing impossible, so equality and hashing are left to object identity
+@dataclass(frozen=True, eq=False)
+class IndicatorWindow:
+    """
+    A type that defines the trailing window of an indicator series, for consumers that only read the most recent
+    values. It has the length of the full series and is indexed with its positions, so it stays aligned with the
+    prices; positions before the window read as None, like entries lacking data for initialization.
+    """
+
+    # The position in the full series of the first value kept in the window.
+    offset: int
+
+    # The trailing indicator values, where None marks entries lacking data for initialization.
+    values: List[Optional[float]]
+
+    def __len__(self) -> int:
+        return self.offset + len(self.values)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Optional[float], List[Optional[float]]]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        position: int = index + len(self) if index < 0 else index
+        if not 0 <= position < len(self):
+            raise IndexError(f"indicator position {index} is outside of the series of length {len(self)}")
+        return None if position < self.offset else self.values[position - self.offset]
+
+    def __iter__(self) -> Iterator[Optional[float]]:
+        return chain(repeat(None, self.offset), self.values)
@@ -1,5 +1,8 @@
 from datetime import datetime, timezone, timedelta
 from dateutil.relativedelta import relativedelta
+from typing import List
+from zoneinfo import ZoneInfo
+import numpy as np
 
 def datatime_to_seconds(time: datetime) -> int:
     """Convert UTC datatime to seconds representation."""
@@ -13,6 +16,32 @@ def milliseconds_to_datatime(milliseconds: int) -> datetime:
     """Convert milliseconds to UTC datatime."""
     return datetime.fromtimestamp(milliseconds / 1000.0, tz=timezone.utc)
 
+def utc_offset_milliseconds(milliseconds: int, zone: ZoneInfo) -> int:
+    """Get the UTC offset of the time zone in milliseconds at the given UTC milliseconds."""
+    return milliseconds_to_datatime(milliseconds).astimezone(zone).utcoffset() // timedelta(milliseconds=1)
+
+def milliseconds_to_clock(milliseconds: np.ndarray, zone: ZoneInfo) -> List[str]:
+    """Convert UTC milliseconds to 'HH:MM' wall clock strings in the given time zone."""
+    # Resolve the offset at the start and end of each distinct UTC hour, it applies to the whole hour when they agree
+    hours, inverse = np.unique(milliseconds // 3_600_000, return_inverse=True)
+    inverse = inverse.ravel()
+    starts: np.ndarray = np.array([
+        utc_offset_milliseconds(hour * 3_600_000, zone) for hour in hours.tolist()
+    ], dtype=np.int64)
+    ends: np.ndarray = np.array([
+        utc_offset_milliseconds((hour + 1) * 3_600_000, zone) for hour in hours.tolist()
+    ], dtype=np.int64)
+    offsets: np.ndarray = starts[inverse]
+
+    # A transition falls inside hours whose offsets disagree, which is not always on the hour (e.g. Lord Howe shifts
+    # by 30 minutes), so timestamps in those hours are resolved individually
+    for index in np.flatnonzero((starts != ends)[inverse]).tolist():
+        offsets[index] = utc_offset_milliseconds(int(milliseconds[index]), zone)
+
+    # Shift into local time and keep the minute of the day
+    minutes: np.ndarray = (milliseconds + offsets) // 60_000 % 1440
+    return [f"{minute // 60:02d}:{minute % 60:02d}" for minute in minutes.tolist()]
+
 def datatime_now() -> datetime:
     """Get the current UTC datetime."""
     return datetime.now(tz=timezone.utc).replace(second=0, microsecond=0)
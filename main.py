@@ -3,12 +3,20 @@ from core.price import *
 from core.llm import *
 from core.execution import *
 from core.utilities import datetime_from_past, datatime_now
+from concurrent.futures import ThreadPoolExecutor
 
 def main():
-    prices: Iterable[PriceRepresentable] = BinancePriceProvider().fetch(PriceProviderContext(
+    prices: PriceBatch = CachedPriceProvider(BinancePriceProvider()).fetch(PriceProviderContext(
         symbol=MarketIdentifier(instrument=TradableInstrument.ETHUSDT, category=TradableCategory.crypto),
         interval=PriceInterval.minute15, start_time=datetime_from_past(hours=24), end_time=datatime_now(), limit=None
     ))
+    window_size: int = 48
+
+    # Indicators are independent scans over the same close prices and their kernels release the GIL
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        rsi = executor.submit(relative_strength_index, prices=prices, period=14, tail=window_size)
+        ema20 = executor.submit(exponential_moving_average, prices=prices, period=20, tail=window_size)
+        ema50 = executor.submit(exponential_moving_average, prices=prices, period=50, tail=window_size)
 
     prompt: LocalizableString = TradeReviewContext(executions=[
         TradeExecution(
@@ -24,9 +32,7 @@ def main():
             posterior_growth_rate=1.5, is_sell_before_buy=True
         )
     ], price_snapshot=PriceIndicatorSnapshot(
-        prices=prices, rsi=relative_strength_index(prices=prices, period=14),
-        ema20=exponential_moving_average(prices=prices, period=20), ema50=exponential_moving_average(prices=prices, period=50),
-        window_size=48
+        prices=prices, rsi=rsi.result(), ema20=ema20.result(), ema50=ema50.result(), window_size=window_size
     ), comments=LocalizableString({
         PreferredLanguage.ENGLISH: "-1 in ratios and rates indicates not available.",
         PreferredLanguage.CHINESE: "价格一整个下午都横盘在$2750附近没有波动，而我却想要为了开单而开单导致了亏损，这是基于猜测而非指标的开仓。"